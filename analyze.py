@@ -8,14 +8,82 @@ This script analyzes three literary texts (Austen, Twain, Doyle) and computes:
 - Word-level n-grams (unigrams, bigrams, trigrams)
 - Sentence structure statistics (length distribution, mean, std dev)
 
-All results are saved as JSON files for later use in text generation.
+All results are saved as JSON files for later use in text generation; the
+word bigrams and trigrams are also saved id-encoded (a JSON vocabulary plus
+binary .ids files), which generator.py loads in preference to the JSON.
 """
 
 import json
-import statistics
+import math
+import sys
+from array import array
+from collections import Counter
+from itertools import islice
 from pathlib import Path
 from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib encoder is used otherwise
+    orjson = None
+
+
+def write_json(data, filename: str, indent: bool = True):
+    """Write data as UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0))
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2 if indent else None, ensure_ascii=False)
+
+
+def count_ngrams(tokens: list, n: int) -> dict:
+    """
+    Count n-grams (n >= 2) as token tuples, like FrequencyAnalyzer.calculate_ngrams.
+    
+    The window is built by zipping n offset views of the token list, so the
+    whole count runs inside Counter's C loop instead of slicing a tuple per
+    position; keys come out in the same first-seen order.
+    """
+    return dict(Counter(zip(*(islice(tokens, i, None) for i in range(n)))))
+
+
+def save_frequency_table(analyzer: FrequencyAnalyzer, frequencies: dict, filename: str):
+    """
+    Save an n-gram frequency table as JSON (same layout as
+    FrequencyAnalyzer.save_frequencies), using orjson when available.
+    """
+    if orjson is None:
+        analyzer.save_frequencies(frequencies, filename)
+        return
+    
+    json_friendly = {
+        '||'.join(key) if isinstance(key, tuple) else key: value
+        for key, value in frequencies.items()
+    }
+    
+    write_json(json_friendly, filename)
+
+
+def save_id_table(frequencies: dict, vocab: dict, filename: str):
+    """
+    Save an n-gram frequency table in the compact id-encoded layout.
+    
+    The file holds flat little-endian int32 rows: the n token ids (indices
+    into the vocabulary list) followed by the count. generator.py loads it
+    straight into an int array, with no key strings to split.
+    """
+    rows = array('i')
+    for ngram, count in frequencies.items():
+        rows.extend([vocab[token] for token in ngram])
+        rows.append(count)
+    
+    if sys.byteorder == 'big':
+        rows.byteswap()
+    with open(filename, 'wb') as f:
+        rows.tofile(f)
+
 
 def analyze_author(author_name: str, filename: str, output_dir: str = '.') -> dict:
     """
@@ -66,17 +134,17 @@ def analyze_author(author_name: str, filename: str, output_dir: str = '.') -> di
     
     # Calculate n-grams
     char_unigrams = analyzer.calculate_ngrams(char_tokens, n=1)
-    char_bigrams = analyzer.calculate_ngrams(char_tokens, n=2)
-    char_trigrams = analyzer.calculate_ngrams(char_tokens, n=3)
+    char_bigrams = count_ngrams(char_tokens, n=2)
+    char_trigrams = count_ngrams(char_tokens, n=3)
     
     print(f"   ✓ Unique char unigrams: {len(char_unigrams):,}")
     print(f"   ✓ Unique char bigrams: {len(char_bigrams):,}")
     print(f"   ✓ Unique char trigrams: {len(char_trigrams):,}")
     
     # Save character frequencies
-    analyzer.save_frequencies(char_unigrams, f'{output_dir}/{author_name}_char_unigrams.json')
-    analyzer.save_frequencies(char_bigrams, f'{output_dir}/{author_name}_char_bigrams.json')
-    analyzer.save_frequencies(char_trigrams, f'{output_dir}/{author_name}_char_trigrams.json')
+    save_frequency_table(analyzer, char_unigrams, f'{output_dir}/{author_name}_char_unigrams.json')
+    save_frequency_table(analyzer, char_bigrams, f'{output_dir}/{author_name}_char_bigrams.json')
+    save_frequency_table(analyzer, char_trigrams, f'{output_dir}/{author_name}_char_trigrams.json')
     
     print(f"   ✓ Saved character frequency files")
     
@@ -92,17 +160,23 @@ def analyze_author(author_name: str, filename: str, output_dir: str = '.') -> di
     
     # Calculate n-grams
     word_unigrams = analyzer.calculate_ngrams(word_tokens, n=1)
-    word_bigrams = analyzer.calculate_ngrams(word_tokens, n=2)
-    word_trigrams = analyzer.calculate_ngrams(word_tokens, n=3)
+    word_bigrams = count_ngrams(word_tokens, n=2)
+    word_trigrams = count_ngrams(word_tokens, n=3)
     
     print(f"   ✓ Unique word unigrams: {len(word_unigrams):,}")
     print(f"   ✓ Unique word bigrams: {len(word_bigrams):,}")
     print(f"   ✓ Unique word trigrams: {len(word_trigrams):,}")
     
     # Save word frequencies
-    analyzer.save_frequencies(word_unigrams, f'{output_dir}/{author_name}_word_unigrams.json')
-    analyzer.save_frequencies(word_bigrams, f'{output_dir}/{author_name}_word_bigrams.json')
-    analyzer.save_frequencies(word_trigrams, f'{output_dir}/{author_name}_word_trigrams.json')
+    save_frequency_table(analyzer, word_unigrams, f'{output_dir}/{author_name}_word_unigrams.json')
+    save_frequency_table(analyzer, word_bigrams, f'{output_dir}/{author_name}_word_bigrams.json')
+    save_frequency_table(analyzer, word_trigrams, f'{output_dir}/{author_name}_word_trigrams.json')
+    
+    # Id-encoded copies of the word bigram/trigram tables for generator.py
+    word_vocab = {word: i for i, word in enumerate(word_unigrams)}
+    write_json(list(word_vocab), f'{output_dir}/{author_name}_word_vocab.json', indent=False)
+    save_id_table(word_bigrams, word_vocab, f'{output_dir}/{author_name}_word_bigrams.ids')
+    save_id_table(word_trigrams, word_vocab, f'{output_dir}/{author_name}_word_trigrams.ids')
     
     print(f"   ✓ Saved word frequency files")
     
@@ -117,17 +191,19 @@ def analyze_author(author_name: str, filename: str, output_dir: str = '.') -> di
         print("❌ ERROR: No sentences found!")
         return None
     
-    # Compute statistics
-    avg_length = statistics.mean(sentence_lengths)
-    std_length = statistics.stdev(sentence_lengths) if len(sentence_lengths) > 1 else 0.0
-    min_length = min(sentence_lengths)
-    max_length = max(sentence_lengths)
-    
     # Create length distribution dictionary
-    length_distribution = {}
-    for length in sentence_lengths:
-        length_str = str(length)
-        length_distribution[length_str] = length_distribution.get(length_str, 0) + 1
+    length_counts = Counter(sentence_lengths)
+    length_distribution = {str(length): count for length, count in length_counts.items()}
+    min_length = min(length_counts)
+    max_length = max(length_counts)
+    
+    # Compute statistics from the histogram, one term per distinct length;
+    # the sums are exact ints, so this matches statistics.mean/stdev
+    n = len(sentence_lengths)
+    total = sum(length * count for length, count in length_counts.items())
+    total_sq = sum(length * length * count for length, count in length_counts.items())
+    avg_length = total / n
+    std_length = math.sqrt((n * total_sq - total * total) / (n * (n - 1))) if n > 1 else 0.0
     
     # Compile sentence statistics
     sentence_stats = {
@@ -145,8 +221,7 @@ def analyze_author(author_name: str, filename: str, output_dir: str = '.') -> di
     print(f"   ✓ Sentence length range: {min_length} - {max_length} words")
     
     # Save sentence statistics
-    with open(f'{output_dir}/{author_name}_sentence_stats.json', 'w', encoding='utf-8') as f:
-        json.dump(sentence_stats, f, indent=2, ensure_ascii=False)
+    write_json(sentence_stats, f'{output_dir}/{author_name}_sentence_stats.json')
     
     print(f"   ✓ Saved sentence statistics")
     
@@ -209,10 +284,11 @@ def main():
             print(f"{author:<12} {data['total_sentences']:<12,} {data['avg_sentence_length']:<12.2f} {data['word_unigrams']:<15,}")
         
         # List generated files
-        print(f"\n📁 Generated JSON files:")
-        print(f"   • {len(results)} × 7 frequency files (char/word unigrams, bigrams, trigrams)")
+        print(f"\n📁 Generated files:")
+        print(f"   • {len(results)} × 6 frequency files (char/word unigrams, bigrams, trigrams)")
         print(f"   • {len(results)} × 1 sentence statistics file")
-        print(f"   • Total: {len(results) * 8} JSON files created")
+        print(f"   • {len(results)} × 3 id-encoded word files (vocabulary, bigrams, trigrams)")
+        print(f"   • Total: {len(results) * 10} files created ({len(results) * 8} JSON, {len(results) * 2} .ids)")
         
         print(f"\n✨ All analyses complete! Files are ready for Part 3 (Text Generation)")
     else:
@@ -11,10 +11,362 @@ by analyze.py to create increasingly coherent text.
 import json
 import random
 import statistics
-from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+import sys
+from array import array
+from bisect import bisect_right
+from functools import cached_property
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 from pathlib import Path
 
+try:
+    from orjson import loads as _loads
+except ImportError:  # Optional speed-up; the stdlib parser is used otherwise
+    _loads = json.loads
+
+
+# Alphabet for zero-order (uniform) character generation
+_CHAR0_ALPHABET = 'abcdefghijklmnopqrstuvwxyz '
+
+# Alias keep-probabilities are stored as 16-bit fixed point out of this scale
+_PROB_BITS = 16
+_PROB_SCALE = 1 << _PROB_BITS
+
+# Read buffer for frequency files
+_READ_BUFFER_SIZE = 1 << 16
+
+# N-gram order of each raw table kind, by table name suffix
+_NGRAM_ORDERS = {'unigrams': 1, 'bigrams': 2, 'trigrams': 3}
+
+
+def _build_alias_table(counts) -> Tuple[array, array]:
+    """
+    Build a Walker alias table over a row of counts (Vose's algorithm).
+    
+    Returns (prob, alias): sampling picks a bucket i uniformly and keeps it
+    when a 16-bit draw is below prob[i], otherwise takes bucket alias[i].
+    """
+    n = len(counts)
+    scale = n / sum(counts)
+    scaled = [count * scale for count in counts]
+    
+    prob = array('H', [_PROB_SCALE - 1]) * n
+    alias = array('i', range(n))
+    
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = min(round(scaled[s] * _PROB_SCALE), _PROB_SCALE - 1)
+        alias[s] = l
+        scaled[l] = (scaled[l] + scaled[s]) - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+    
+    # Whatever is left over (including float round-off) keeps its own bucket
+    return prob, alias
+
+
+class _ChainTables:
+    """
+    Integer-encoded Markov model for one token level (characters or words).
+    
+    Every token gets an id, and every prefix owns the row slice
+    row_ptr[r]:row_ptr[r + 1] of the flat col_idx / counts / alias_prob /
+    alias_idx arrays (CSR layout). Each row holds the follow counts of that
+    prefix and, once built, its alias table, with alias_idx pointing into
+    the same row.
+    
+    Rows are compiled straight from the n-gram counts, and alias tables are
+    built lazily: build_row runs Vose's algorithm for a row the first time it
+    is sampled (built[r] marks the done ones), so a short run only pays for
+    the contexts it actually visits.
+    
+    Rows are found without building any key objects: unigram_row is the
+    unigram distribution, bigram_rows[prev] the bigram context (-1 if
+    unseen) and trigram_rows[prev2 * vocab_size + prev1] the trigram context.
+    
+    Orders are added one at a time (add_unigrams, add_bigrams, add_trigrams),
+    so a level is only compiled as far as a caller needs; `order` is the
+    highest one added so far.
+    
+    alias_prob is quantized to uint16: a bucket keeps its own outcome when a
+    16-bit random draw is below its value, so 0 never keeps and buckets that
+    always keep alias to themselves.
+    """
+    
+    def __init__(self):
+        self.id2token: List[str] = []
+        self.token2id: Dict[str, int] = {}
+        self.vocab_size = 0
+        self.unigram_row: Optional[int] = None
+        self.bigram_rows = array('i')
+        self.trigram_rows: Dict[int, int] = {}
+        self.has_bigrams = False
+        self.row_ptr = array('i', [0])
+        self.col_idx = array('i')
+        self.counts = array('i')
+        self.alias_prob = array('H')
+        self.alias_idx = array('i')
+        self.built = bytearray()
+        self.order = 0
+    
+    def token_id(self, token: str) -> int:
+        """Return the id of a token, assigning a new one if needed."""
+        token_id = self.token2id.get(token)
+        if token_id is None:
+            token_id = self.token2id[token] = len(self.id2token)
+            self.id2token.append(token)
+        return token_id
+    
+    def add_unigrams(self, unigrams: Dict[str, int]):
+        """Add the unigram counts (order 1)."""
+        next_ids = [self.token_id(token) for token in unigrams]
+        if next_ids:
+            self.unigram_row = self._add_rows([0] * len(next_ids), next_ids, list(unigrams.values()))[0]
+        self.order = 1
+    
+    def encode_ngrams(self, ngrams: Iterable[tuple], n: int) -> List[array]:
+        """
+        Number the tokens of (token_1, ..., token_n, count) tuples, returning
+        n token id columns followed by the count column.
+        """
+        columns = list(zip(*ngrams)) or [()] * (n + 1)
+        return [array('i', map(self.token_id, column)) for column in columns[:n]] + [array('i', columns[n])]
+    
+    def add_bigrams(self, prev_ids: array, next_ids: array, counts: array):
+        """Add the bigram counts, as id columns prev -> next seen count times (order 2)."""
+        self._grow_bigram_rows()
+        
+        bigram_rows = self.bigram_rows
+        for prev, row in self._add_rows(prev_ids, next_ids, counts).items():
+            bigram_rows[prev] = row
+        self.has_bigrams = len(prev_ids) > 0
+        self.order = 2
+    
+    def add_trigrams(self, prev2_ids: array, prev1_ids: array, next_ids: array, counts: array):
+        """Add the trigram counts, as id columns (prev2, prev1) -> next seen count times (order 3, the last one)."""
+        self._grow_bigram_rows()
+        
+        # Nothing is numbered after this, so the vocabulary size is final
+        # before trigram contexts are keyed by prev2 * vocab_size + prev1
+        vocab_size = self.vocab_size = len(self.id2token)
+        keys = [first * vocab_size + second for first, second in zip(prev2_ids, prev1_ids)]
+        self.trigram_rows = self._add_rows(keys, next_ids, counts)
+        self.order = 3
+    
+    def _add_rows(self, keys, next_ids, counts) -> Dict[int, int]:
+        """
+        Append one row per distinct context key, holding that key's
+        (next_ids[i], counts[i]) entries in their original order, and return
+        {key: row}. Alias tables are left to build_row.
+        """
+        if not keys:
+            return {}
+        
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        sorted_keys = [keys[i] for i in order]
+        starts = [i for i in range(1, len(sorted_keys)) if sorted_keys[i] != sorted_keys[i - 1]]
+        
+        base = len(self.col_idx)
+        first_row = len(self.row_ptr) - 1
+        self.col_idx.extend(map(next_ids.__getitem__, order))
+        self.counts.extend(map(counts.__getitem__, order))
+        self.row_ptr.extend(base + i for i in starts)
+        self.row_ptr.append(len(self.col_idx))
+        self.built.extend(bytes(len(starts) + 1))
+        self._grow_alias_arrays()
+        
+        return {sorted_keys[start]: first_row + row for row, start in enumerate([0] + starts)}
+    
+    def build_row(self, row: int):
+        """Build the alias table of a row, filling its alias_prob / alias_idx slices."""
+        start = self.row_ptr[row]
+        end = self.row_ptr[row + 1]
+        prob, alias = _build_alias_table(self.counts[start:end])
+        self.alias_prob[start:end] = prob
+        self.alias_idx[start:end] = array('i', [start + i for i in alias])
+        self.built[row] = 1
+    
+    def _grow_alias_arrays(self):
+        """Zero-extend alias_prob / alias_idx to cover every row added so far."""
+        missing = len(self.col_idx) - len(self.alias_prob)
+        self.alias_prob.frombytes(bytes(self.alias_prob.itemsize * missing))
+        self.alias_idx.frombytes(bytes(self.alias_idx.itemsize * missing))
+    
+    def _grow_bigram_rows(self):
+        """Extend bigram_rows with -1 entries up to the current vocabulary."""
+        missing = len(self.id2token) - len(self.bigram_rows)
+        if missing > 0:
+            self.bigram_rows.extend(array('i', [-1]) * missing)
+    
+    def context_row(self, prev2: int, prev1: int) -> Optional[int]:
+        """Row of the trigram context (prev2, prev1), or None if unseen."""
+        return self.trigram_rows.get(prev2 * self.vocab_size + prev1)
+    
+    def next_row(self, ids: List[int], order: int) -> Optional[int]:
+        """
+        Row to draw the token after `ids` from, using at most `order`-gram
+        context: the trigram context once two ids are known at order 3, the
+        bigram context at order 2 and the unigram row otherwise. None if
+        that context is unseen.
+        """
+        if order >= 3 and len(ids) >= 2:
+            return self.context_row(ids[-2], ids[-1])
+        if order == 2:
+            row = self.bigram_rows[ids[-1]]
+            return row if row >= 0 else None
+        return self.unigram_row
+    
+    def sample(self, row: int) -> int:
+        """Draw one token id from a row."""
+        if not self.built[row]:
+            self.build_row(row)
+        start = self.row_ptr[row]
+        i = start + random.randrange(self.row_ptr[row + 1] - start)
+        if random.getrandbits(_PROB_BITS) >= self.alias_prob[i]:
+            i = self.alias_idx[i]
+        return self.col_idx[i]
+    
+    def sample_many(self, row: int, k: int) -> array:
+        """
+        Draw k independent token ids from a row in one batch.
+        
+        Uses a single uniform per draw: its integer part picks the bucket and
+        its fractional part decides between the bucket and its alias.
+        """
+        if not self.built[row]:
+            self.build_row(row)
+        start = self.row_ptr[row]
+        n = self.row_ptr[row + 1] - start
+        col_idx = self.col_idx
+        alias_prob = self.alias_prob
+        alias_idx = self.alias_idx
+        rand = random.random
+        
+        out = array('i')
+        append = out.append
+        for _ in range(k):
+            u = rand() * n
+            i = int(u)
+            j = start + i
+            append(col_idx[j] if (u - i) * _PROB_SCALE < alias_prob[j] else col_idx[alias_idx[j]])
+        
+        return out
+    
+    def decode(self, ids) -> List[str]:
+        """Map a sequence of token ids back to tokens."""
+        return list(map(self.id2token.__getitem__, ids))
+
+
+def _load_json_buffered(path: Path):
+    """
+    Parse a frequency file, read whole through a 64 KiB buffer.
+    
+    Raises FileNotFoundError if the JSON file is missing.
+    """
+    with open(path, 'rb', buffering=_READ_BUFFER_SIZE) as f:
+        data = f.read()
+    return _loads(data)
+
+
+def _json_table(name: str) -> cached_property:
+    """A TextGenerator attribute that loads {author}_{name}.json on first access."""
+    def load(self) -> dict:
+        return self._load_json(f'{self.author}_{name}.json')
+    return cached_property(load)
+
+
+def _new_id_buffer(size: int) -> array:
+    """Allocate a zeroed int array of `size` token ids to generate into."""
+    return array('i', bytes(array('i').itemsize * size))
+
+
+def _fill_bigram_ids(tables: _ChainTables, out: array, start: int):
+    """
+    Fill out[start:] in place by running the bigram -> unigram backoff chain,
+    continuing from the id at out[start - 1].
+    
+    Same shape as _fill_trigram_ids, one order lower.
+    """
+    bigram_rows = tables.bigram_rows
+    unigram_row = tables.unigram_row
+    row_ptr = tables.row_ptr
+    col_idx = tables.col_idx
+    alias_prob = tables.alias_prob
+    alias_idx = tables.alias_idx
+    built = tables.built
+    build_row = tables.build_row
+    random_ = random.random
+    prev = out[start - 1]
+    
+    for k in range(start, len(out)):
+        row = bigram_rows[prev]
+        if row < 0:
+            row = unigram_row
+        
+        if not built[row]:
+            build_row(row)
+        
+        begin = row_ptr[row]
+        u = random_() * (row_ptr[row + 1] - begin)
+        bucket = int(u)
+        i = begin + bucket
+        if (u - bucket) * _PROB_SCALE >= alias_prob[i]:
+            i = alias_idx[i]
+        
+        prev = out[k] = col_idx[i]
+
+
+def _fill_trigram_ids(tables: _ChainTables, out: array, start: int):
+    """
+    Fill out[start:] in place by running the trigram -> bigram -> unigram
+    backoff chain, continuing from the ids at out[start - 2] and out[start - 1].
+    
+    Works purely on token ids and flat arrays, with everything the loop
+    touches bound to locals and the output preallocated by the caller, so
+    each step is a couple of dict/array lookups and one uniform draw, split
+    into bucket and alias decision as in _ChainTables.sample_many.
+    """
+    vocab_size = tables.vocab_size
+    get_trigram_row = tables.trigram_rows.get
+    bigram_rows = tables.bigram_rows
+    unigram_row = tables.unigram_row
+    row_ptr = tables.row_ptr
+    col_idx = tables.col_idx
+    alias_prob = tables.alias_prob
+    alias_idx = tables.alias_idx
+    built = tables.built
+    build_row = tables.build_row
+    random_ = random.random
+    prev1 = out[start - 1]
+    context = out[start - 2] * vocab_size + prev1
+    
+    for k in range(start, len(out)):
+        row = get_trigram_row(context)
+        if row is None:
+            row = bigram_rows[prev1]
+            if row < 0:
+                row = unigram_row
+        
+        if not built[row]:
+            build_row(row)
+        
+        begin = row_ptr[row]
+        u = random_() * (row_ptr[row + 1] - begin)
+        bucket = int(u)
+        i = begin + bucket
+        if (u - bucket) * _PROB_SCALE >= alias_prob[i]:
+            i = alias_idx[i]
+        
+        # Slide the (prev2, prev1) window as a single int key
+        next_id = col_idx[i]
+        context = prev1 * vocab_size + next_id
+        prev1 = out[k] = next_id
+
 
 class TextGenerator:
     """
@@ -41,111 +393,183 @@ class TextGenerator:
         self.author = author
         self.data_dir = data_dir
         
-        # Load all frequency tables
-        self.char_unigrams = self._load_json(f'{author}_char_unigrams.json')
-        self.char_bigrams = self._load_json(f'{author}_char_bigrams.json')
-        self.char_trigrams = self._load_json(f'{author}_char_trigrams.json')
-        
-        self.word_unigrams = self._load_json(f'{author}_word_unigrams.json')
-        self.word_bigrams = self._load_json(f'{author}_word_bigrams.json')
-        self.word_trigrams = self._load_json(f'{author}_word_trigrams.json')
+        # Frequency tables, models and their compiled form are all built on
+        # first use, so callers only pay for the levels they generate
+        self._char_tables = _ChainTables()
+        self._word_tables = _ChainTables()
+    
+    LEVELS = ('char-0', 'char-1', 'char-2', 'char-3', 'word-1', 'word-2', 'word-3')
+    
+    # Raw frequency tables
+    JSON_TABLES = ('char_unigrams', 'char_bigrams', 'char_trigrams',
+                   'word_unigrams', 'word_bigrams', 'word_trigrams', 'sentence_stats')
+    char_unigrams = _json_table('char_unigrams')
+    char_bigrams = _json_table('char_bigrams')
+    char_trigrams = _json_table('char_trigrams')
+    word_unigrams = _json_table('word_unigrams')
+    word_bigrams = _json_table('word_bigrams')
+    word_trigrams = _json_table('word_trigrams')
+    sentence_stats = _json_table('sentence_stats')
+    
+    # Word list of the id-encoded bigram/trigram tables, when analyze.py wrote them
+    @cached_property
+    def word_vocab(self) -> Optional[List[str]]:
+        return self._load_vocab(f'{self.author}_word_vocab.json')
+    
+    def preload(self) -> 'TextGenerator':
+        """
+        Load every JSON table this generator still needs up front (for
+        callers that use every level).
         
-        self.sentence_stats = self._load_json(f'{author}_sentence_stats.json')
+        Tables already loaded or compiled are skipped, and so are the word
+        bigram/trigram JSON files when their id-encoded tables exist.
+        Missing files are left to the lazy loaders, which warn about them.
         
-        # Convert frequency tables to probabilities
-        self._build_ngram_models()
+        Returns:
+            The generator itself
+        """
+        for name in self.JSON_TABLES:
+            level, _, kind = name.partition('_')
+            tables = self._char_tables if level == 'char' else self._word_tables
+            if name in self.__dict__ or tables.order >= _NGRAM_ORDERS.get(kind, 4):
+                continue
+            if name in ('word_bigrams', 'word_trigrams') and self._id_table_path(name).exists():
+                continue
+            
+            path = Path(self.data_dir) / f'{self.author}_{name}.json'
+            if path.exists():
+                getattr(self, name)
+        return self
     
     def _load_json(self, filename: str) -> dict:
         """Load JSON file from data directory."""
-        filepath = Path(self.data_dir) / filename
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_json_buffered(Path(self.data_dir) / filename)
         except FileNotFoundError:
-            print(f"⚠️  Warning: {filename} not found")
+            print(f"⚠️  Warning: {filename} not found", file=sys.stderr)
             return {}
     
-    def _build_ngram_models(self):
-        """Convert frequency tables to probability models and Markov chains."""
-        
-        # Character models
-        self.char_unigram_probs = self._frequencies_to_probabilities(self.char_unigrams)
-        self.char_bigram_chains = self._build_markov_chains(self.char_bigrams)
-        self.char_trigram_chains = self._build_markov_chains(self.char_trigrams)
-        
-        # Word models
-        self.word_unigram_probs = self._frequencies_to_probabilities(self.word_unigrams)
-        self.word_bigram_chains = self._build_markov_chains(self.word_bigrams)
-        self.word_trigram_chains = self._build_markov_chains(self.word_trigrams)
+    def _load_vocab(self, filename: str) -> Optional[List[str]]:
+        """Load the word id -> word list, or None if it was not generated."""
+        filepath = Path(self.data_dir) / filename
+        if not filepath.exists():
+            return None
+        return self._load_json(filename)
     
-    def _frequencies_to_probabilities(self, frequencies: Dict[str, int]) -> Dict[str, float]:
-        """Convert frequency counts to probability distribution."""
-        if not frequencies:
-            return {}
+    def _id_table_path(self, name: str) -> Path:
+        """Path of the id-encoded form of a word n-gram table ('word_bigrams' or 'word_trigrams')."""
+        return Path(self.data_dir) / f'{self.author}_{name}.ids'
+    
+    def _load_id_table(self, name: str) -> Optional[array]:
+        """
+        Load an id-encoded word n-gram table ('word_bigrams' or 'word_trigrams',
+        see analyze.save_id_table) into an int array, or return None if it (or
+        the vocabulary it refers to) is missing.
+        """
+        filepath = self._id_table_path(name)
+        if not filepath.exists() or self.word_vocab is None:
+            return None
         
-        total = sum(frequencies.values())
-        return {key: count / total for key, count in frequencies.items()}
+        rows = array('i')
+        with open(filepath, 'rb') as f:
+            rows.frombytes(f.read())
+        if sys.byteorder == 'big':
+            rows.byteswap()
+        return rows
     
-    def _build_markov_chains(self, ngrams: Dict[str, int]) -> Dict[str, Dict[str, float]]:
+    def _level_tables(self, level: str, order: int) -> _ChainTables:
         """
-        Build Markov chains from n-gram frequencies.
+        Return the integer-encoded CSR tables of a level ('char' or 'word'),
+        compiling its models up to the given n-gram order on first use.
         
-        For bigrams: {key1||key2} -> chains[key1][key2] = probability
-        For trigrams: {key1||key2||key3} -> chains[(key1, key2)][key3] = probability
+        Raw bigram/trigram JSON tables are released once compiled, since the
+        CSR rows hold all their counts; unigrams stay for the anchor word checks.
         """
-        chains = defaultdict(lambda: defaultdict(float))
+        tables = self._char_tables if level == 'char' else self._word_tables
+        if tables.order < 1 <= order:
+            tables.add_unigrams(getattr(self, f'{level}_unigrams'))
+        if tables.order < 2 <= order:
+            tables.add_bigrams(*self._ngram_columns(tables, level, 2))
+            self._release_ngram_table(level, 'bigram')
+        if tables.order < 3 <= order:
+            tables.add_trigrams(*self._ngram_columns(tables, level, 3))
+            self._release_ngram_table(level, 'trigram')
+        return tables
+    
+    def _release_ngram_table(self, level: str, name: str):
+        """Drop the cached raw JSON table of a compiled n-gram order, if it was loaded."""
+        self.__dict__.pop(f'{level}_{name}s', None)
+    
+    def _ngram_columns(self, tables: _ChainTables, level: str, n: int) -> List[array]:
+        """
+        Return a level's bigram (n=2) or trigram (n=3) counts as n token id
+        columns, numbered as in `tables`, followed by the count column.
+        
+        The id-encoded word tables are used as they are when analyze.py wrote
+        them: their vocabulary follows word_unigrams order, as does the
+        numbering add_unigrams gives `tables`, so no token needs to be looked
+        up. They are checked against the loaded word_unigrams by content
+        first: the vocabulary must equal its words, in order, and the counts
+        must total one n-gram per position of its N-word text (N - n + 1).
+        Otherwise (e.g. the JSON was regenerated without the id files) the
+        JSON table's keys are split and numbered.
+        """
+        name = 'bigrams' if n == 2 else 'trigrams'
+        if level == 'word':
+            rows = self._load_id_table(f'word_{name}')
+            if rows is not None:
+                columns = [rows[i::n + 1] for i in range(n + 1)]
+                unigrams = self.word_unigrams
+                if (tables.id2token[:len(unigrams)] == self.word_vocab
+                        and sum(columns[n]) == sum(unigrams.values()) - (n - 1)):
+                    return columns
+                print(f"⚠️  Warning: {self._id_table_path(f'word_{name}').name} does not match "
+                      f"{self.author}_word_unigrams.json, using the JSON table", file=sys.stderr)
+        
+        return tables.encode_ngrams(self._split_ngrams(getattr(self, f'{level}_{name}'), n), n)
+    
+    def _split_ngrams(self, ngrams: Dict[str, int], n: int) -> Iterator[tuple]:
+        """
+        Yield the entries of a '||'-joined bigram (n=2) or trigram (n=3) table
+        as (token_1, ..., token_n, count) tuples.
         
+        Keys are split with two str.partition calls (no list per entry), and
+        any without the parts of an n-gram are skipped.
+        """
         for ngram_str, count in ngrams.items():
-            parts = ngram_str.split('||')
-            
-            if len(parts) == 2:
-                # Bigram: prefix is first part, next is second part
-                prefix = parts[0]
-                next_item = parts[1]
-                chains[prefix][next_item] += count
+            first, sep, rest = ngram_str.partition('||')
+            if not sep:
+                continue
             
-            elif len(parts) == 3:
-                # Trigram: prefix is tuple of first two, next is third
-                prefix = (parts[0], parts[1])
-                next_item = parts[2]
-                chains[prefix][next_item] += count
-        
-        # Normalize to probabilities
-        for prefix in chains:
-            total = sum(chains[prefix].values())
-            for next_item in chains[prefix]:
-                chains[prefix][next_item] /= total
-        
-        return dict(chains)
-    
-    def _weighted_choice(self, choices: Dict[str, float]) -> Optional[str]:
-        """Select an item using weighted probability distribution."""
-        if not choices:
-            return None
-        
-        items = list(choices.keys())
-        weights = list(choices.values())
+            second, sep, third = rest.partition('||')
+            if sep and n == 3:
+                yield first, second, third, count
+            elif not sep and n == 2:
+                yield first, second, count
+    
+    @cached_property
+    def _length_sampler(self) -> Tuple[array, array, int]:
+        """Sentence lengths with their cumulative counts, and the total count."""
+        length_dist = (self.sentence_stats or {}).get('length_distribution', {})
         
-        try:
-            return random.choices(items, weights=weights, k=1)[0]
-        except:
-            return random.choice(items) if items else None
+        # Convert string keys back to integers
+        values = array('i')
+        cum = array('q')
+        total = 0
+        for length, count in sorted((int(length_str), count) for length_str, count in length_dist.items()):
+            if count > 0:
+                total += count
+                values.append(length)
+                cum.append(total)
+        return values, cum, total
     
     def _sample_sentence_length(self) -> int:
         """Sample a sentence length from the author's distribution."""
-        if not self.sentence_stats or 'length_distribution' not in self.sentence_stats:
+        values, cum, total = self._length_sampler
+        if not total:
             return random.randint(5, 20)  # Fallback default
         
-        length_dist = self.sentence_stats['length_distribution']
-        
-        # Convert string keys back to integers
-        lengths = []
-        for length_str, count in length_dist.items():
-            lengths.extend([int(length_str)] * count)
-        
-        if lengths:
-            return random.choice(lengths)
-        return random.randint(5, 20)
+        return values[bisect_right(cum, random.randrange(total))]
     
     # ========== CHARACTER-LEVEL GENERATION ==========
     
@@ -154,95 +578,68 @@ class TextGenerator:
         Zero-order character generation: random characters with equal probability.
         All 26 letters + space treated with equal likelihood.
         """
-        chars = 'abcdefghijklmnopqrstuvwxyz '
-        return ''.join(random.choice(chars) for _ in range(length))
+        return ''.join(random.choices(_CHAR0_ALPHABET, k=length))
     
     def generate_char_1(self, length: int = 100) -> str:
         """
         First-order character generation: use English character frequencies.
         Each character chosen independently based on frequency distribution.
         """
-        result = []
-        for _ in range(length):
-            char = self._weighted_choice(self.char_unigram_probs)
-            if char:
-                result.append(char)
+        tables = self._level_tables('char', 1)
+        unigram_row = tables.unigram_row
+        if unigram_row is None:
+            return ''
         
-        return ''.join(result)
+        return ''.join(tables.decode(tables.sample_many(unigram_row, length)))
     
     def generate_char_2(self, length: int = 100) -> str:
         """
         Second-order character generation: bigram-based Markov chain.
         Each character depends on the previous character (bigram statistics).
         """
-        if not self.char_bigram_chains:
+        tables = self._level_tables('char', 2)
+        if not tables.has_bigrams:
             return self.generate_char_1(length)
         
-        result = []
+        unigram_row = tables.unigram_row
+        if unigram_row is None:
+            return ''
+        
+        result = _new_id_buffer(max(length, 1))
         
         # Start with a random character from unigrams
-        current = self._weighted_choice(self.char_unigram_probs)
-        if current:
-            result.append(current)
+        result[0] = tables.sample(unigram_row)
         
         # Generate remaining characters using bigram chains
-        while len(result) < length:
-            next_char = self.char_bigram_chains.get(current, {})
-            next_char = self._weighted_choice(next_char)
-            
-            if next_char is None:
-                # Fallback: pick random character
-                next_char = self._weighted_choice(self.char_unigram_probs)
-            
-            if next_char:
-                result.append(next_char)
-                current = next_char
-            else:
-                break
+        # (falling back to a random character)
+        _fill_bigram_ids(tables, result, 1)
         
-        return ''.join(result[:length])
+        return ''.join(tables.decode(result[:length]))
     
     def generate_char_3(self, length: int = 100) -> str:
         """
         Third-order character generation: trigram-based Markov chain.
         Each character depends on the previous two characters (trigram statistics).
         """
-        if not self.char_trigram_chains:
+        tables = self._level_tables('char', 3)
+        if not tables.trigram_rows:
             return self.generate_char_2(length)
         
-        result = []
+        unigram_row = tables.unigram_row
+        if unigram_row is None:
+            return ''
         
-        # Start with first two characters
-        char1 = self._weighted_choice(self.char_unigram_probs)
-        char2 = self._weighted_choice(self.char_unigram_probs)
+        result = _new_id_buffer(max(length, 2))
         
-        if char1:
-            result.append(char1)
-        if char2:
-            result.append(char2)
+        # Start with first two characters
+        result[0] = tables.sample(unigram_row)
+        result[1] = tables.sample(unigram_row)
         
         # Generate remaining characters using trigram chains
-        while len(result) < length:
-            context = (result[-2], result[-1])
-            
-            next_char_probs = self.char_trigram_chains.get(context, {})
-            next_char = self._weighted_choice(next_char_probs)
-            
-            if next_char is None:
-                # Fallback to bigram
-                next_char = self.char_bigram_chains.get(result[-1], {})
-                next_char = self._weighted_choice(next_char)
-            
-            if next_char is None:
-                # Fallback to unigram
-                next_char = self._weighted_choice(self.char_unigram_probs)
-            
-            if next_char:
-                result.append(next_char)
-            else:
-                break
+        # (falling back to bigram, then unigram)
+        _fill_trigram_ids(tables, result, 2)
         
-        return ''.join(result[:length])
+        return ''.join(tables.decode(result[:length]))
     
     # ========== WORD-LEVEL GENERATION ==========
     
@@ -251,210 +648,186 @@ class TextGenerator:
         First-order word generation: unigram-based.
         Words chosen independently based on frequency distribution.
         """
+        tables = self._level_tables('word', 1)
+        unigram_row = tables.unigram_row
         sentences = []
+        lengths = []
         attempts = 0
         max_attempts = 100
         
-        while len(sentences) < num_sentences and attempts < max_attempts:
+        # Sample every sentence length first (an empty sentence is redrawn,
+        # within max_attempts), then all words in one batch
+        while unigram_row is not None and len(lengths) < num_sentences and attempts < max_attempts:
             sentence_length = self._sample_sentence_length()
-            words = []
-            
-            for _ in range(sentence_length):
-                word = self._weighted_choice(self.word_unigram_probs)
-                if word:
-                    words.append(word)
+            if sentence_length > 0:
+                lengths.append(sentence_length)
+            attempts += 1
+        
+        if lengths:
+            all_words = tables.decode(tables.sample_many(unigram_row, sum(lengths)))
             
-            if words:
+            start = 0
+            for sentence_length in lengths:
+                words = all_words[start:start + sentence_length]
+                start += sentence_length
+                
                 # Format sentence: capitalize first word, add period
                 sentence = ' '.join(words)
                 sentence = sentence[0].upper() + sentence[1:] + '.'
                 sentences.append(sentence)
-            
-            attempts += 1
         
         # Check for anchor words
-        result = ' '.join(sentences)
-        
         if anchor_words:
-            result = self._integrate_anchor_words(result, anchor_words, num_sentences)
+            sentences = self._integrate_anchor_words(sentences, anchor_words, order=1)
         
-        return result
+        return ' '.join(sentences)
     
     def generate_word_2(self, num_sentences: int = 3, anchor_words: Optional[List[str]] = None) -> str:
         """
         Second-order word generation: bigram-based Markov chain.
         Word pairs drive the generation (2nd-order Markov).
         """
-        if not self.word_bigram_chains:
+        tables = self._level_tables('word', 2)
+        if not tables.has_bigrams:
             return self.generate_word_1(num_sentences, anchor_words)
         
+        unigram_row = tables.unigram_row
         sentences = []
         
-        for _ in range(num_sentences):
+        for _ in range(num_sentences if unigram_row is not None else 0):
             sentence_length = self._sample_sentence_length()
-            words = []
+            
+            ids = _new_id_buffer(max(sentence_length, 1))
             
             # Start with a random word
-            current_word = self._weighted_choice(self.word_unigram_probs)
-            if current_word:
-                words.append(current_word)
+            ids[0] = tables.sample(unigram_row)
             
             # Generate remaining words using bigram chains
-            while len(words) < sentence_length:
-                next_word_probs = self.word_bigram_chains.get(current_word, {})
-                next_word = self._weighted_choice(next_word_probs)
-                
-                if next_word is None:
-                    # Fallback: pick random word
-                    next_word = self._weighted_choice(self.word_unigram_probs)
-                
-                if next_word:
-                    words.append(next_word)
-                    current_word = next_word
-                else:
-                    break
+            # (falling back to a random word)
+            _fill_bigram_ids(tables, ids, 1)
+            words = tables.decode(ids)
             
-            if words:
-                # Format sentence
-                sentence = ' '.join(words)
-                sentence = sentence[0].upper() + sentence[1:] + '.'
-                sentences.append(sentence)
-        
-        result = ' '.join(sentences)
+            # Format sentence
+            sentence = ' '.join(words)
+            sentence = sentence[0].upper() + sentence[1:] + '.'
+            sentences.append(sentence)
         
+        # Check for anchor words
         if anchor_words:
-            result = self._integrate_anchor_words(result, anchor_words, num_sentences)
+            sentences = self._integrate_anchor_words(sentences, anchor_words, order=2)
         
-        return result
+        return ' '.join(sentences)
     
     def generate_word_3(self, num_sentences: int = 3, anchor_words: Optional[List[str]] = None) -> str:
         """
         Third-order word generation: trigram-based Markov chain.
         Word triplets drive the generation (3rd-order Markov).
         """
-        if not self.word_trigram_chains:
+        tables = self._level_tables('word', 3)
+        if not tables.trigram_rows:
             return self.generate_word_2(num_sentences, anchor_words)
         
+        unigram_row = tables.unigram_row
         sentences = []
         
-        for _ in range(num_sentences):
+        for _ in range(num_sentences if unigram_row is not None else 0):
             sentence_length = self._sample_sentence_length()
-            words = []
             
-            # Start with first two words
-            word1 = self._weighted_choice(self.word_unigram_probs)
-            word2 = self._weighted_choice(self.word_unigram_probs)
+            ids = _new_id_buffer(max(sentence_length, 2))
             
-            if word1:
-                words.append(word1)
-            if word2:
-                words.append(word2)
+            # Start with first two words
+            ids[0] = tables.sample(unigram_row)
+            ids[1] = tables.sample(unigram_row)
             
             # Generate remaining words using trigram chains
-            while len(words) < sentence_length:
-                context = (words[-2], words[-1])
-                
-                next_word_probs = self.word_trigram_chains.get(context, {})
-                next_word = self._weighted_choice(next_word_probs)
-                
-                if next_word is None:
-                    # Fallback to bigram
-                    next_word_probs = self.word_bigram_chains.get(words[-1], {})
-                    next_word = self._weighted_choice(next_word_probs)
-                
-                if next_word is None:
-                    # Fallback to unigram
-                    next_word = self._weighted_choice(self.word_unigram_probs)
-                
-                if next_word:
-                    words.append(next_word)
-                else:
-                    break
+            # (falling back to bigram, then unigram)
+            _fill_trigram_ids(tables, ids, 2)
+            words = tables.decode(ids)
             
-            if words:
-                # Format sentence
-                sentence = ' '.join(words)
-                sentence = sentence[0].upper() + sentence[1:] + '.'
-                sentences.append(sentence)
-        
-        result = ' '.join(sentences)
+            # Format sentence
+            sentence = ' '.join(words)
+            sentence = sentence[0].upper() + sentence[1:] + '.'
+            sentences.append(sentence)
         
+        # Check for anchor words
         if anchor_words:
-            result = self._integrate_anchor_words(result, anchor_words, num_sentences)
+            sentences = self._integrate_anchor_words(sentences, anchor_words, order=3)
         
-        return result
+        return ' '.join(sentences)
     
     # ========== ANCHOR WORD INTEGRATION ==========
     
-    def _integrate_anchor_words(self, text: str, anchor_words: List[str], num_sentences: int) -> str:
+    def _integrate_anchor_words(self, sentences: List[str], anchor_words: List[str],
+                                order: int = 3) -> List[str]:
         """
-        Integrate anchor words naturally into generated text.
+        Integrate anchor words naturally into generated sentences.
         
         Strategy: Generate multiple candidates and select ones containing anchor words.
-        If an anchor word is missing, replace a sentence with text containing it.
+        If an anchor word is missing, replace a sentence with one containing it,
+        generated with the caller's n-gram order.
         """
         if not anchor_words:
-            return text
+            return sentences
         
-        # Check which anchor words are in the text
-        text_lower = text.lower()
+        # Check which anchor words are in the text (lowercased once for all anchors)
+        text_lower = ' '.join(sentences).lower()
         missing_anchors = [w for w in anchor_words if w.lower() not in text_lower]
         
         if not missing_anchors:
-            return text  # All anchor words already present
+            return sentences  # All anchor words already present
         
         # Regenerate sentences containing missing anchor words
-        sentences = text.split('. ')
+        sentences = list(sentences)
         
         for anchor in missing_anchors:
             # Try to generate a sentence containing this anchor word
             for attempt in range(10):
                 if anchor in self.word_unigrams:
                     # Generate around this word
-                    candidate = self._generate_around_anchor(anchor, num_words=self._sample_sentence_length())
+                    candidate = self._generate_around_anchor(anchor, num_words=self._sample_sentence_length(),
+                                                             order=order)
                     if candidate and anchor.lower() in candidate.lower():
                         # Replace a random sentence
-                        idx = random.randint(0, len(sentences) - 1)
-                        sentences[idx] = candidate
+                        if sentences:
+                            sentences[random.randint(0, len(sentences) - 1)] = candidate
+                        else:
+                            sentences.append(candidate)
                         break
         
-        return '. '.join(sentences)
+        return sentences
     
-    def _generate_around_anchor(self, anchor_word: str, num_words: int = 10) -> Optional[str]:
+    def _generate_around_anchor(self, anchor_word: str, num_words: int = 10,
+                                order: int = 3) -> Optional[str]:
         """
-        Generate a sentence that naturally includes a specific anchor word.
+        Generate a sentence that naturally includes a specific anchor word,
+        using word n-grams up to the given order (compiled only that far).
         """
         words = []
         current = anchor_word
         words.append(current)
+        tables = self._level_tables('word', order)
+        anchor_id = tables.token2id.get(anchor_word)
         
         # Generate words before the anchor
         before_count = random.randint(2, 5)
-        prev_words = [anchor_word]
+        prev_ids = [anchor_id]
         
         for _ in range(before_count):
-            if len(prev_words) >= 2:
-                context = (prev_words[-2], prev_words[-1])
-                next_word = self._weighted_choice(self.word_bigram_chains.get(context, {}))
-            else:
-                next_word = self._weighted_choice(self.word_unigram_probs)
-            
-            if next_word:
-                prev_words.append(next_word)
+            row = tables.next_row(prev_ids, order)
+            if row is not None:
+                prev_ids.append(tables.sample(row))
         
         # Generate words after the anchor
         after_count = num_words - before_count
-        next_words = [anchor_word]
+        next_ids = [anchor_id]
         
         for _ in range(after_count):
-            if len(next_words) >= 2:
-                context = (next_words[-2], next_words[-1])
-                word = self._weighted_choice(self.word_bigram_chains.get(context, {}))
-            else:
-                word = self._weighted_choice(self.word_unigram_probs)
-            
-            if word:
-                next_words.append(word)
+            row = tables.next_row(next_ids, order)
+            if row is not None:
+                next_ids.append(tables.sample(row))
+        
+        prev_words = [anchor_word] + tables.decode(prev_ids[1:])
+        next_words = [anchor_word] + tables.decode(next_ids[1:])
         
         # Combine and format
         all_words = prev_words[::-1] + next_words[1:]
@@ -494,4 +867,30 @@ class TextGenerator:
         if level not in level_map:
             raise ValueError(f"Invalid level: {level}. Must be 'char-0' through 'word-3'")
 
-        return level_map[level]()
\ No newline at end of file
+        return level_map[level]()
+    
+    def generate_batch(self, specs: List[Tuple[str, dict]]) -> List[str]:
+        """
+        Generate several texts in one call.
+        
+        Args:
+            specs: (level, kwargs) pairs, kwargs being generate()'s keyword
+                arguments for that level
+        
+        Returns:
+            Generated text strings, in spec order
+        
+        All levels are checked before any text is generated. Levels of the
+        same kind share their loaded tables, and each is compiled only once
+        up to the highest order requested.
+        """
+        for level, _ in specs:
+            if level not in self.LEVELS:
+                raise ValueError(f"Invalid level: {level}. Must be 'char-0' through 'word-3'")
+        
+        for kind in ('char', 'word'):
+            orders = [int(level[-1]) for level, _ in specs if level.startswith(kind)]
+            if max(orders, default=0) > 0:
+                self._level_tables(kind, max(orders))
+        
+        return [self.generate(level, **kwargs) for level, kwargs in specs]
\ No newline at end of file
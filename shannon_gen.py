@@ -18,22 +18,157 @@ Usage Examples:
 """
 
 import argparse
+import functools
+import json
+import os
+import re
 import sys
+from itertools import chain, zip_longest
 from pathlib import Path
-from generator import TextGenerator
+from textwrap import shorten
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up for --json output
+    orjson = None
+
+# Supported authors and approximation levels (in help/display order)
+_AUTHORS = ('austen', 'twain', 'doyle')
+_LEVELS = ('char-0', 'char-1', 'char-2', 'char-3', 'word-1', 'word-2', 'word-3')
+_IS_CHAR = frozenset(level for level in _LEVELS if level.startswith('char-'))
+
+# Sentence boundary for blending: whitespace after '.', '!' or '?', which
+# stays with its sentence
+_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+# Banner rules for headers and sections
+_HBAR = "=" * 70
+_SBAR = "-" * 70
+
+
+# CLI banner, encoded once (plain ASCII, so valid in any stdout encoding)
+_BANNER_BYTES = (
+    f"\n{_HBAR}\n"
+    "  SHANNON TEXT GENERATION - CLI INTERFACE\n"
+    "  Assignment 3: Approximating Natural Language\n"
+    f"{_HBAR}\n"
+).encode('ascii')
+
+
+class ShannonUserError(Exception):
+    """An expected failure caused by user input, reported without a traceback"""
+
+
+def _csv_authors(value):
+    """argparse type: comma-separated list of at least 2 known authors"""
+    authors = tuple(a.strip() for a in value.split(','))
+    invalid = [a for a in authors if a not in _AUTHORS]
+    if invalid:
+        raise argparse.ArgumentTypeError(
+            f"invalid author: {', '.join(invalid)} (valid options: {', '.join(_AUTHORS)})")
+    if len(authors) < 2:
+        raise argparse.ArgumentTypeError("blend requires at least 2 authors")
+    return authors
+
+
+def _csv_words(value):
+    """argparse type: comma-separated list of words, blanks dropped"""
+    return tuple(w for w in (w.strip() for w in value.split(',')) if w)
+
+
+def _positive_int(value):
+    """argparse type: integer >= 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+@functools.lru_cache(maxsize=8)
+def _get_generator(author, data_dir):
+    """Return the TextGenerator for an author, reusing it across commands and levels"""
+    if not any(Path(data_dir).glob(f'{author}_*.json')):
+        raise ShannonUserError(
+            f"No frequency tables for '{author}' in '{data_dir}' - run the analyze command first")
+    
+    from generator import TextGenerator
+    return TextGenerator(author, data_dir=data_dir)
+
+
+def format_header(title):
+    """Return a formatted header"""
+    return f"\n{_HBAR}\n  {title}\n{_HBAR}\n\n"
+
+
+def format_section(title):
+    """Return a formatted section header"""
+    return f"\n{title}\n{_SBAR}\n"
 
 
 def print_header(title):
     """Print a formatted header"""
-    print("\n" + "="*70)
-    print(f"  {title}")
-    print("="*70 + "\n")
+    sys.stdout.write(format_header(title))
+
+
+def print_traceback():
+    """Print the current exception's traceback when SHANNON_DEBUG is set"""
+    if os.environ.get('SHANNON_DEBUG'):
+        import traceback
+        traceback.print_exc()
 
 
-def print_section(title):
-    """Print a formatted section header"""
-    print(f"\n{title}")
-    print("-" * 70)
+def write_bytes(data, encoding='utf-8'):
+    """
+    Write encoded output with os.write() on the stdout file descriptor,
+    bypassing Python's stdout buffering (one syscall for typical output).
+    """
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        # Stdout replaced by an in-memory stream
+        sys.stdout.write(data.decode(encoding))
+        return
+    
+    sys.stdout.flush()  # Keep order with text already written
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def write_json_lines(records):
+    """Write records as newline-delimited JSON (--json mode) in one write"""
+    if orjson is not None:
+        data = b"".join(orjson.dumps(record) + b"\n" for record in records)
+    else:
+        data = "".join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n" for record in records).encode('utf-8')
+    write_bytes(data)
+
+
+def print_error(message, as_json=False):
+    """Report an error: as a JSON error record in --json mode, a ❌ line otherwise"""
+    if as_json:
+        write_json_lines([{'error': str(message)}])
+    else:
+        print(f"❌ {message}")
+
+
+def write_buffered(buf):
+    """
+    Write buffered output chunks with a single write and empty the buffer.
+    
+    Goes straight to the file descriptor where no newline translation is
+    needed, so the output is on screen (or in the pipe) on return.
+    """
+    text = "".join(buf)
+    buf.clear()
+    
+    encoding = getattr(sys.stdout, 'encoding', None)
+    if encoding and os.linesep == "\n":
+        write_bytes(text.encode(encoding, sys.stdout.errors or 'strict'), encoding)
+    else:
+        sys.stdout.write(text)
+        if sys.stdout.isatty():
+            sys.stdout.flush()
 
 
 def cmd_analyze(args):
@@ -46,11 +181,14 @@ def cmd_analyze(args):
     print_header("ANALYZE: Building Frequency Tables")
     
     try:
-        from analyze import analyze_author
-        
         author = args.author
         filename = args.file
         
+        if not Path(filename).is_file():
+            raise ShannonUserError(f"File '{filename}' not found!")
+        
+        from analyze import analyze_author
+        
         print(f"Author: {author}")
         print(f"Text file: {filename}")
         print()
@@ -59,25 +197,35 @@ def cmd_analyze(args):
         result = analyze_author(author, filename, output_dir='JSON_Files')
         
         if result:
-            print_header("ANALYSIS COMPLETE")
-            print(f"✅ Successfully analyzed '{author}'")
-            print(f"\nGenerated Files:")
-            print(f"   • {author}_char_unigrams.json")
-            print(f"   • {author}_char_bigrams.json")
-            print(f"   • {author}_char_trigrams.json")
-            print(f"   • {author}_word_unigrams.json")
-            print(f"   • {author}_word_bigrams.json")
-            print(f"   • {author}_word_trigrams.json")
-            print(f"   • {author}_sentence_stats.json")
-            print()
+            generated_files = [
+                f"{author}_char_unigrams.json",
+                f"{author}_char_bigrams.json",
+                f"{author}_char_trigrams.json",
+                f"{author}_word_unigrams.json",
+                f"{author}_word_bigrams.json",
+                f"{author}_word_trigrams.json",
+                f"{author}_sentence_stats.json",
+                f"{author}_word_vocab.json",
+                f"{author}_word_bigrams.ids",
+                f"{author}_word_trigrams.ids",
+            ]
+            buf = [format_header("ANALYSIS COMPLETE"),
+                   f"✅ Successfully analyzed '{author}'\n",
+                   "\nGenerated Files:\n"]
+            buf.extend(f"   • {name}\n" for name in generated_files)
+            buf.append("\n")
+            write_buffered(buf)
         else:
             print("❌ Analysis failed!")
             sys.exit(1)
     
+    except ShannonUserError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
     except Exception as e:
-        print(f"❌ Error during analysis: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"❌ Error during analysis: {type(e).__name__}: {e}")
+        print_traceback()
         sys.exit(1)
 
 
@@ -90,55 +238,103 @@ def cmd_generate(args):
         shannon_gen.py generate --author austen --level char-2 --length 100
         shannon_gen.py generate --author twain --level word-3 --sentences 5
         shannon_gen.py generate --author doyle --level word-2 --sentences 3 --anchors elementary,Watson,deduce
+        shannon_gen.py generate --author austen --level word-3 --repeat 10
+        shannon_gen.py generate --author austen --stdin-loop < requests.txt
     """
-    print_header("GENERATE: Text Generation")
-    
     try:
         author = args.author
         level = args.level
+        length = args.length if args.length else 100
+        sentences = args.sentences if args.sentences else 3
+        anchor_words = list(args.anchors) if args.anchors else None
         
-        print(f"Author: {author}")
-        print(f"Level: {level}")
+        if not args.json:
+            buf = [format_header("GENERATE: Text Generation"), f"Author: {author}\n"]
+            
+            if args.stdin_loop:
+                buf.append("Levels: read from stdin, one 'LEVEL [ANCHORS]' per line\n")
+            else:
+                buf.append(f"Level: {level}\n")
+                
+                if level in _IS_CHAR:
+                    buf.append(f"Length: {length} characters\n")
+                else:
+                    buf.append(f"Sentences: {sentences}\n")
+            
+            if anchor_words:
+                buf.append(f"Anchor words: {', '.join(anchor_words)}\n")
+            
+            if args.repeat > 1:
+                buf.append(f"Repeat: {args.repeat}\n")
+            
+            buf.append("\n")
+            write_buffered(buf)
         
-        # Determine if character or word level
-        is_char_level = level.startswith('char-')
+        # Initialize generator (loaded once, however many texts follow)
+        gen = _get_generator(author, '.')
         
-        if is_char_level:
-            length = args.length if args.length else 100
-            print(f"Length: {length} characters")
-        else:
-            sentences = args.sentences if args.sentences else 3
-            print(f"Sentences: {sentences}")
+        def generate_text(level, anchor_words):
+            if level in _IS_CHAR:
+                return gen.generate(level, length=length)
+            return gen.generate(level, num_sentences=sentences, anchor_words=anchor_words)
         
-        if args.anchors:
-            anchor_words = [w.strip() for w in args.anchors.split(',')]
-            print(f"Anchor words: {', '.join(anchor_words)}")
-        else:
-            anchor_words = None
+        if args.stdin_loop:
+            _generate_stdin_loop(author, generate_text, args.repeat, anchor_words, args.json)
+            return
         
-        print()
+        texts = [generate_text(level, anchor_words) for _ in range(args.repeat)]
         
-        # Initialize generator
-        gen = TextGenerator(author, data_dir='.')
+        if args.json:
+            write_json_lines({'author': author, 'level': level, 'text': text} for text in texts)
+            return
         
-        # Generate text
-        if is_char_level:
-            text = gen.generate(level, length=length)
-        else:
-            text = gen.generate(level, num_sentences=sentences, anchor_words=anchor_words)
-        
-        # Display result
-        print_section("Generated Text")
-        print(text)
-        print()
+        # Display result(s)
+        write_buffered([format_section("Generated Text"), "---\n".join(text + "\n" for text in texts), "\n"])
+    
+    except ShannonUserError as e:
+        print_error(e, args.json)
+        sys.exit(1)
     
     except Exception as e:
-        print(f"❌ Error during generation: {e}")
-        import traceback
-        traceback.print_exc()
+        print_error(f"Error during generation: {type(e).__name__}: {e}", args.json)
+        print_traceback()
         sys.exit(1)
 
 
+def _generate_stdin_loop(author, generate_text, repeat, default_anchors, as_json):
+    """
+    Serve generate requests from stdin with one loaded generator: each line
+    is 'LEVEL [ANCHORS]', answered with its text(s) (or one JSON record per
+    text in --json mode); as with --repeat, texts are separated by '---' lines
+    """
+    separator = ""
+    for line in sys.stdin:
+        fields = line.split(None, 1)
+        if not fields:
+            continue
+        
+        level = fields[0]
+        if level not in _LEVELS:
+            error = f"Invalid level: {level} (valid options: {', '.join(_LEVELS)})"
+            if as_json:
+                write_json_lines([{'author': author, 'level': level, 'error': error}])
+                sys.stdout.flush()
+            else:
+                sys.stdout.write(f"{separator}❌ {error}\n")
+                separator = "---\n"
+                sys.stdout.flush()
+            continue
+        anchor_words = list(_csv_words(fields[1])) if len(fields) > 1 else default_anchors
+        
+        texts = [generate_text(level, anchor_words or None) for _ in range(repeat)]
+        if as_json:
+            write_json_lines({'author': author, 'level': level, 'text': text} for text in texts)
+        else:
+            sys.stdout.write(separator + "---\n".join(text + "\n" for text in texts))
+            separator = "---\n"
+        sys.stdout.flush()
+
+
 def cmd_compare(args):
     """
     Command: compare
@@ -146,56 +342,50 @@ def cmd_compare(args):
     
     Usage: shannon_gen.py compare --author austen --sentences 2
     """
-    print_header("COMPARE: All Approximation Levels")
-    
     try:
         author = args.author
         sentences = args.sentences if args.sentences else 2
         
-        print(f"Author: {author}")
-        print(f"Sentences per level: {sentences}")
-        print()
+        if not args.json:
+            write_buffered([format_header("COMPARE: All Approximation Levels"),
+                            f"Author: {author}\n",
+                            f"Sentences per level: {sentences}\n",
+                            "\n"])
         
-        # Initialize generator
-        gen = TextGenerator(author, data_dir='.')
+        # Initialize generator (every level is used, so load all tables now)
+        gen = _get_generator(author, '.').preload()
         
-        # Define all levels
-        levels = [
-            'char-0',
-            'char-1',
-            'char-2',
-            'char-3',
-            'word-1',
-            'word-2',
-            'word-3'
+        # Generate every level in one batch, collecting output to write in one go
+        specs = [
+            (level, {'length': 100} if level in _IS_CHAR else {'num_sentences': sentences})
+            for level in _LEVELS
         ]
+        texts = gen.generate_batch(specs)
         
-        # Generate for each level
-        for level in levels:
-            print_section(f"Level: {level.upper()}")
-            
-            try:
-                if level.startswith('char-'):
-                    text = gen.generate(level, length=100)
-                else:
-                    text = gen.generate(level, num_sentences=sentences)
-                
-                # Display text with word wrapping for readability
-                display_text = text if len(text) <= 200 else text[:200] + "..."
-                print(display_text)
+        if args.json:
+            write_json_lines({'author': author, 'level': level, 'text': text}
+                             for level, text in zip(_LEVELS, texts))
+            return
+        
+        buf = []
+        for level, text in zip(_LEVELS, texts):
+            buf.append(format_section(f"Level: {level.upper()}"))
             
-            except Exception as e:
-                print(f"❌ Error generating {level}: {e}")
+            # Display text truncated at a word boundary for readability
+            # (short text is kept verbatim: shorten() collapses whitespace)
+            display_text = text if len(text) <= 200 else shorten(text, width=200, placeholder="...")
+            buf.append(display_text + "\n")
         
-        print()
-        print("="*70)
-        print("Comparison complete!")
-        print("="*70 + "\n")
+        buf.append(f"\n{_HBAR}\nComparison complete!\n{_HBAR}\n\n")
+        write_buffered(buf)
+    
+    except ShannonUserError as e:
+        print_error(e, args.json)
+        sys.exit(1)
     
     except Exception as e:
-        print(f"❌ Error during comparison: {e}")
-        import traceback
-        traceback.print_exc()
+        print_error(f"Error during comparison: {type(e).__name__}: {e}", args.json)
+        print_traceback()
         sys.exit(1)
 
 
@@ -208,80 +398,71 @@ def cmd_blend(args):
     
     Strategy: Generate from each author and blend their styles
     """
-    print_header("BLEND: Multiple Author Styles (Bonus Feature)")
-    
     try:
-        authors_str = args.authors
+        authors = args.authors
         level = args.level
         sentences = args.sentences if args.sentences else 3
         
-        # Parse authors
-        authors = [a.strip() for a in authors_str.split(',')]
-        
-        print(f"Authors: {', '.join(authors)}")
-        print(f"Level: {level}")
-        print(f"Sentences per author: {sentences}")
-        print()
-        
-        # Check all authors are valid
-        valid_authors = {'austen', 'twain', 'doyle'}
-        for author in authors:
-            if author not in valid_authors:
-                print(f"❌ Invalid author: {author}")
-                print(f"   Valid options: austen, twain, doyle")
-                sys.exit(1)
-        
-        if len(authors) < 2:
-            print("❌ Blend requires at least 2 authors")
-            sys.exit(1)
+        if not args.json:
+            write_buffered([format_header("BLEND: Multiple Author Styles (Bonus Feature)"),
+                            f"Authors: {', '.join(authors)}\n",
+                            f"Level: {level}\n",
+                            f"Sentences per author: {sentences}\n",
+                            "\n"])
         
         # Generate from each author
         all_texts = []
         for author in authors:
-            print_section(f"Generating from {author.upper()}")
-            
-            gen = TextGenerator(author, data_dir='.')
-            
-            if level.startswith('char-'):
-                text = gen.generate(level, length=50)
+            gen = _get_generator(author, '.')
+            if level in _IS_CHAR:
+                all_texts.append(gen.generate(level, length=50))
             else:
-                text = gen.generate(level, num_sentences=sentences)
-            
-            all_texts.append(text)
-            
-            display_text = text if len(text) <= 150 else text[:150] + "..."
-            print(display_text)
+                all_texts.append(gen.generate(level, num_sentences=sentences))
         
         # Blend strategy: interleave sentences from each author
-        print_section("BLENDED OUTPUT")
-        
-        blended = " ".join(all_texts)
-        
-        # For word-level, try to create a blend by alternating
-        if not level.startswith('char-'):
-            sentences_by_author = [t.split('. ') for t in all_texts]
-            blended_sentences = []
+        if level in _IS_CHAR:
+            # Char-level output has no sentences to alternate; keep each
+            # author's run intact (interleaving single characters would
+            # break the n-gram structure the levels are meant to show)
+            blended = " ".join(all_texts)
+        else:
+            # For word-level, create a blend by alternating sentences
+            sentences_by_author = [_SENT_SPLIT.split(t) for t in all_texts]
             
             # Round-robin blend sentences from each author
-            max_sentences = max(len(s) for s in sentences_by_author)
-            for i in range(max_sentences):
-                for j, author_sentences in enumerate(sentences_by_author):
-                    if i < len(author_sentences):
-                        blended_sentences.append(author_sentences[i])
+            blended_sentences = [
+                s for s in chain.from_iterable(zip_longest(*sentences_by_author))
+                if s is not None
+            ]
             
-            blended = ". ".join(blended_sentences)
+            blended = " ".join(blended_sentences)
         
-        print(blended)
-        print()
+        if args.json:
+            records = [{'author': author, 'level': level, 'text': text}
+                       for author, text in zip(authors, all_texts)]
+            records.append({'authors': list(authors), 'level': level, 'text': blended})
+            write_json_lines(records)
+            return
+        
+        buf = []
+        for author, text in zip(authors, all_texts):
+            buf.append(format_section(f"Generating from {author.upper()}"))
+            
+            display_text = text if len(text) <= 150 else shorten(text, width=150, placeholder="...")
+            buf.append(display_text + "\n")
         
-        print("="*70)
-        print(f"✅ Blended {len(authors)} authors successfully!")
-        print("="*70 + "\n")
+        buf.append(format_section("BLENDED OUTPUT"))
+        buf.append(blended + "\n\n")
+        buf.append(f"{_HBAR}\n✅ Blended {len(authors)} authors successfully!\n{_HBAR}\n\n")
+        write_buffered(buf)
+    
+    except ShannonUserError as e:
+        print_error(e, args.json)
+        sys.exit(1)
     
     except Exception as e:
-        print(f"❌ Error during blending: {e}")
-        import traceback
-        traceback.print_exc()
+        print_error(f"Error during blending: {type(e).__name__}: {e}", args.json)
+        print_traceback()
         sys.exit(1)
 
 
@@ -319,7 +500,7 @@ Examples:
     analyze_parser.add_argument(
         '--author',
         required=True,
-        choices=['austen', 'twain', 'doyle'],
+        choices=_AUTHORS,
         help='Author to analyze'
     )
     analyze_parser.add_argument(
@@ -337,15 +518,20 @@ Examples:
     generate_parser.add_argument(
         '--author',
         required=True,
-        choices=['austen', 'twain', 'doyle'],
+        choices=_AUTHORS,
         help='Author to generate from'
     )
-    generate_parser.add_argument(
+    generate_source = generate_parser.add_mutually_exclusive_group(required=True)
+    generate_source.add_argument(
         '--level',
-        required=True,
-        choices=['char-0', 'char-1', 'char-2', 'char-3', 'word-1', 'word-2', 'word-3'],
+        choices=_LEVELS,
         help='Approximation level'
     )
+    generate_source.add_argument(
+        '--stdin-loop',
+        action='store_true',
+        help='Read "LEVEL [ANCHORS]" requests from stdin, one per line, reusing the loaded model'
+    )
     generate_parser.add_argument(
         '--length',
         type=int,
@@ -360,8 +546,20 @@ Examples:
     )
     generate_parser.add_argument(
         '--anchors',
+        type=_csv_words,
         help='Comma-separated words to include (e.g., "elizabeth,bennet,pride")'
     )
+    generate_parser.add_argument(
+        '--repeat',
+        type=_positive_int,
+        default=1,
+        help='Number of texts to generate from the loaded model (default: 1)'
+    )
+    generate_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print results as newline-delimited JSON records, without banners'
+    )
     generate_parser.set_defaults(func=cmd_generate)
     
     # ===== COMPARE COMMAND =====
@@ -372,7 +570,7 @@ Examples:
     compare_parser.add_argument(
         '--author',
         required=True,
-        choices=['austen', 'twain', 'doyle'],
+        choices=_AUTHORS,
         help='Author to compare'
     )
     compare_parser.add_argument(
@@ -381,6 +579,11 @@ Examples:
         default=2,
         help='Number of sentences per level (default: 2)'
     )
+    compare_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print results as newline-delimited JSON records, without banners'
+    )
     compare_parser.set_defaults(func=cmd_compare)
     
     # ===== BLEND COMMAND (BONUS) =====
@@ -391,12 +594,13 @@ Examples:
     blend_parser.add_argument(
         '--authors',
         required=True,
+        type=_csv_authors,
         help='Comma-separated author names (e.g., "austen,twain")'
     )
     blend_parser.add_argument(
         '--level',
         required=True,
-        choices=['char-0', 'char-1', 'char-2', 'char-3', 'word-1', 'word-2', 'word-3'],
+        choices=_LEVELS,
         help='Approximation level'
     )
     blend_parser.add_argument(
@@ -405,28 +609,43 @@ Examples:
         default=3,
         help='Number of sentences per author (default: 3)'
     )
+    blend_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print results as newline-delimited JSON records, without banners'
+    )
     blend_parser.set_defaults(func=cmd_blend)
     
-    # Parse arguments
-    args = parser.parse_args()
+    # No command provided, show help (nothing to parse, no banner)
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(1)
     
-    # Display header
-    print("\n" + "="*70)
-    print("  SHANNON TEXT GENERATION - CLI INTERFACE")
-    print("  Assignment 3: Approximating Natural Language")
-    print("="*70)
+    # Parse arguments (--help and usage errors exit here, before the banner)
+    args = parser.parse_args()
     
     # Execute command if provided
     if hasattr(args, 'func'):
+        # Display header
+        as_json = getattr(args, 'json', False)
+        if not as_json:
+            write_bytes(_BANNER_BYTES)
+        
         try:
             args.func(args)
         except KeyboardInterrupt:
-            print("\n\n⚠️  Interrupted by user")
+            print("\n\n⚠️  Interrupted by user", file=sys.stderr if as_json else sys.stdout)
             sys.exit(0)
+        except ShannonUserError as e:
+            if not as_json:
+                print()
+            print_error(e, as_json)
+            sys.exit(1)
         except Exception as e:
-            print(f"\n❌ Unexpected error: {e}")
-            import traceback
-            traceback.print_exc()
+            if not as_json:
+                print()
+            print_error(f"Unexpected error: {type(e).__name__}: {e}", as_json)
+            print_traceback()
             sys.exit(1)
     else:
         # No command provided, show help